@@ -8,8 +8,8 @@ DESCRIPTION:
   - UPDATED: Now accepts and logs 'radio_freq'.
 """
 import threading
-import time
 import statistics
+from collections import Counter, deque
 import config
 
 
@@ -25,6 +25,51 @@ class DataProcessor:
         self.buffer = {}
         self.lock = threading.Lock()
 
+        # Resolved once: dispatch_reading runs for every decoded reading.
+        self._interval = getattr(config, "RTL_THROTTLE_INTERVAL", 0)
+        self._send = mqtt_handler.send_sensor
+
+        # Throttle loop control: _wakeup ends the current wait early, _stop ends the loop.
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        # Guards _interval changes against the loop deciding to exit on a disabled interval.
+        self._loop_lock = threading.Lock()
+        self._loop_running = False
+        self._loop_thread = None
+
+    def set_interval(self, interval):
+        """Update the throttle interval at runtime.
+
+        Nothing in the bridge calls this yet; it is API for callers that need to retune
+        throttling. The running loop picks the new value up on its next pass. Enabling
+        throttling while no loop is running starts a new loop thread, so buffered
+        readings always get flushed.
+        """
+        with self._loop_lock:
+            self._interval = interval
+            start_loop = interval > 0 and not self._loop_running and not self._stop.is_set()
+        self._wakeup.set()
+        if start_loop:
+            threading.Thread(target=self.start_throttle_loop, daemon=True).start()
+
+    def trigger_flush(self):
+        """Flush the buffer now instead of waiting for the interval to elapse."""
+        self._wakeup.set()
+
+    def stop(self, timeout=5.0):
+        """Exit the throttle loop and publish whatever is still buffered.
+
+        Waits up to `timeout` seconds for the loop thread's final flush, so the
+        caller can tear down MQTT right after this returns.
+        """
+        self._stop.set()
+        self._wakeup.set()
+        t = self._loop_thread
+        if t is not None and t is not threading.current_thread():
+            t.join(timeout)
+        # Covers readings buffered while no loop was running, or after its last pass.
+        self.flush_once()
+
     # --- FIX 1: Add radio_freq to arguments ---
     def dispatch_reading(self, clean_id, field, value, dev_name, model, radio_name="Unknown", radio_freq="Unknown"):
         """
@@ -32,7 +77,7 @@ class DataProcessor:
         If throttling is disabled (interval <= 0), sends immediately.
         Otherwise, stores it in the buffer.
         """
-        interval = getattr(config, "RTL_THROTTLE_INTERVAL", 0)
+        interval = self._interval
 
         # Skip null readings; they shouldn't influence averages or "last known" decisions.
         if value is None:
@@ -40,7 +85,7 @@ class DataProcessor:
         
         # 1. Immediate Dispatch (No Throttling)
         if interval <= 0:
-            self.mqtt_handler.send_sensor(clean_id, field, value, dev_name, model, is_rtl=True)
+            self._send(clean_id, field, value, dev_name, model, is_rtl=True)
             return
 
         # 2. Buffered Dispatch
@@ -61,7 +106,13 @@ class DataProcessor:
                 self.buffer[clean_id]["__meta__"]["freq"] = radio_freq
             
             if field not in self.buffer[clean_id]:
-                self.buffer[clean_id][field] = []
+                # Non-averaged fields (and strings/enums, which can't be averaged)
+                # only ever publish the last sample, so keep a single slot instead
+                # of the whole interval's history.
+                if field in NON_AVERAGED_NUMERIC_FIELDS or not isinstance(value, (int, float)):
+                    self.buffer[clean_id][field] = deque(maxlen=1)
+                else:
+                    self.buffer[clean_id][field] = []
             
             self.buffer[clean_id][field].append(value)
 
@@ -70,66 +121,89 @@ class DataProcessor:
         Thread loop that wakes up every RTL_THROTTLE_INTERVAL seconds,
         averages the buffered data, and sends it to MQTT.
         """
-        interval = getattr(config, "RTL_THROTTLE_INTERVAL", 30)
-        if interval <= 0:
-            return
+        with self._loop_lock:
+            if self._loop_running or self._interval <= 0:
+                return
+            self._loop_running = True
+            self._loop_thread = threading.current_thread()
+
+        print(f"[THROTTLE] Averaging data every {self._interval} seconds.")
 
-        print(f"[THROTTLE] Averaging data every {interval} seconds.")
+        try:
+            while not self._stop.is_set():
+                # Re-read each pass so set_interval() takes effect without a restart.
+                interval = self._interval
+                if interval <= 0:
+                    with self._loop_lock:
+                        if self._interval <= 0:
+                            # Clear the flag under the lock so a concurrent
+                            # set_interval(>0) starts a fresh loop.
+                            self._loop_running = False
+                            break
+                    continue
+                self._wakeup.wait(interval)
+                self._wakeup.clear()
+                self.flush_once()
+        finally:
+            with self._loop_lock:
+                self._loop_running = False
+
+        # stop() or set_interval(0) may land between passes; don't drop what was buffered since.
+        self.flush_once()
+
+    def flush_once(self):
+        """Average and publish everything buffered since the previous flush."""
+        # 1. Swap buffers safely
+        with self.lock:
+            if not self.buffer:
+                return
+            # Hand the filled buffer to this thread and give writers a fresh one.
+            current_batch = self.buffer
+            self.buffer = {}
+
+        count_sent = 0
+        stats_by_radio = Counter()
+        send = self._send
         
-        while True:
-            time.sleep(interval)
-            
-            # 1. Swap buffers safely
-            with self.lock:
-                if not self.buffer:
+        # 2. Process batch
+        for clean_id, device_data in current_batch.items():
+            # This thread owns the batch now, so __meta__ can be popped instead of skipped.
+            meta = device_data.pop("__meta__", {})
+            dev_name = meta.get("name", "Unknown")
+            model = meta.get("model", "Unknown")
+            radio_key = (meta.get("radio", "Unknown"), meta.get("freq", ""))
+
+            for field, values in device_data.items():
+                if not values: 
                     continue
-                current_batch = self.buffer.copy()
-                self.buffer.clear()
 
-            count_sent = 0
-            stats_by_radio = {}
-            
-            # 2. Process batch
-            for clean_id, device_data in current_batch.items():
-                meta = device_data.get("__meta__", {})
-                dev_name = meta.get("name", "Unknown")
-                model = meta.get("model", "Unknown")
-                r_name = meta.get("radio", "Unknown")
-                r_freq = meta.get("freq", "")
-
-                for field, values in device_data.items():
-                    if field == "__meta__": 
-                        continue
-                    if not values: 
-                        continue
-
-                    # Calculate Average (or last known value for strings)
-                    final_val = None
-                    try:
-                        if field in NON_AVERAGED_NUMERIC_FIELDS:
-                            # E.g. battery_ok: publish the last valid sample, not the mean.
-                            final_val = values[-1]
-                        elif isinstance(values[0], (int, float)):
-                            final_val = round(statistics.mean(values), 2)
-                            if final_val.is_integer():
-                                final_val = int(final_val)
-                        else:
-                            final_val = values[-1]
-                    except:
+                # Calculate Average (or last known value for strings)
+                final_val = None
+                try:
+                    if field in NON_AVERAGED_NUMERIC_FIELDS:
+                        # E.g. battery_ok: publish the last valid sample, not the mean.
+                        final_val = values[-1]
+                    elif isinstance(values[0], (int, float)):
+                        # fmean: float-only C path; exact Fractions are moot after rounding.
+                        final_val = round(statistics.fmean(values), 2)
+                        if final_val.is_integer():
+                            final_val = int(final_val)
+                    else:
                         final_val = values[-1]
+                except:
+                    final_val = values[-1]
 
-                    self.mqtt_handler.send_sensor(clean_id, field, final_val, dev_name, model, is_rtl=True)
-                    count_sent += 1
-                    
-                    # --- FIX 3: Group by Radio + Frequency for the log ---
-                    key = f"{r_name}"
-                    if r_freq and r_freq != "Unknown":
-                        key = f"{r_name}[{r_freq}]"
-                        
-                    stats_by_radio[key] = stats_by_radio.get(key, 0) + 1
-            
-            # --- Consolidated Heartbeat Log ---
-            if count_sent > 0:
-                # Format: (RTL_101[915M]: 5, RTL_001[433.92M]: 3)
-                details = ", ".join([f"{k}: {v}" for k, v in stats_by_radio.items()])
-                print(f"[THROTTLE] Flushed {count_sent} readings ({details})")
\ No newline at end of file
+                send(clean_id, field, final_val, dev_name, model, is_rtl=True)
+                count_sent += 1
+                
+                # --- FIX 3: Group by Radio + Frequency for the log ---
+                stats_by_radio[radio_key] += 1
+        
+        # --- Consolidated Heartbeat Log ---
+        if count_sent > 0:
+            # Format: (RTL_101[915M]: 5, RTL_001[433.92M]: 3)
+            details = ", ".join(
+                f"{n}[{f}]: {c}" if f and f != "Unknown" else f"{n}: {c}"
+                for (n, f), c in stats_by_radio.items()
+            )
+            print(f"[THROTTLE] Flushed {count_sent} readings ({details})")
@@ -15,11 +15,11 @@ os.environ["TERM"] = "xterm-256color"
 os.environ["CLICOLOR_FORCE"] = "1"
 
 import builtins
-from datetime import datetime
 import threading
 import time
 import importlib.util
-import subprocess
+from functools import lru_cache
+import shutil
 
 # --- 1. GLOBAL LOGGING & COLOR SETUP ---
 c_cyan    = "\033[1;36m"   # Bold Cyan (Radio IDs / JSON Keys)
@@ -34,6 +34,43 @@ c_reset   = "\033[0m"
 
 _original_print = builtins.print
 
+# Patterns used by the print hook (compiled once; it runs for every log line)
+_JSON_KEY_RE = re.compile(r'("[^"]+")\s*:')
+_JSON_STR_VAL_RE = re.compile(r':\s*("[^"]+")')
+_JSON_NUM_RE = re.compile(r':\s*(-?\d+\.?\d*)')
+_JSON_LIT_RE = re.compile(r':\s*(true|false|null)')
+# Support tags: match the canonical tag and its legacy spellings in one pass each.
+_UNSUP_TAG_RE = re.compile(r"\[(?:\s*!!\s*UNSUPPORTED\s*!!\s*|UNSUPPORTED)\]")
+_SUP_TAG_RE = re.compile(r"\[\s*SUPPORTED\s*\]")
+# Leading run can't contain "[" or a newline, so the prefix never backtracks.
+_TX_MATCH_RE = re.compile(r"[^\[\n]*\[(.*?)\]?:\s+(.*)")
+_BRACKET_RE = re.compile(r"^\[(.*?)\]\s*(.*)")
+
+# Static colored fragments (built once instead of per log line)
+_HDR_INFO  = f"{c_green}INFO{c_reset}{c_white}:{c_reset}"
+_HDR_ERROR = f"{c_red}ERROR{c_reset}{c_white}:{c_reset}"
+_HDR_WARN  = f"{c_yellow}WARN{c_reset}{c_white}:{c_reset}"
+_HDR_DEBUG = f"{c_magenta}DEBUG{c_reset}{c_white}:{c_reset}"
+_HDR_DATA  = f"{c_green}DATA{c_reset}{c_white}:{c_reset}"
+_TAG_UNSUPPORTED = f"{c_white}[{c_reset}{c_yellow}UNSUPPORTED{c_reset}{c_white}]{c_reset}"
+_TAG_SUPPORTED   = f"{c_white}[{c_reset}{c_green}SUPPORTED{c_reset}{c_white}]{c_reset}"
+_BRK_OPEN  = f"{c_white}[{c_reset}"
+_BRK_CLOSE = f"{c_reset}{c_white}]:{c_reset} "
+
+# Log timestamp, formatted at most once per wall-clock second
+_ts_sec = None
+_ts_text = ""
+
+def _log_time():
+    global _ts_sec, _ts_text
+    sec = int(time.time())
+    if sec != _ts_sec:
+        _ts_text = time.strftime("%H:%M:%S", time.localtime(sec))
+        _ts_sec = sec
+    return _ts_text
+
+# Source tags come from a small, repeating set ([STARTUP], [RTL], [MQTT], ...).
+@lru_cache(maxsize=256)
 def get_source_color(clean_text):
     clean = clean_text.lower()
     if "unsupported" in clean: return c_yellow
@@ -45,75 +82,80 @@ def get_source_color(clean_text):
     return c_cyan
 
 def highlight_json(text):
-    text = re.sub(r'("[^"]+")\s*:', f'{c_cyan}\\1{c_reset}{c_white}:{c_reset}', text)
-    text = re.sub(r':\s*("[^"]+")', f': {c_white}\\1{c_reset}', text)
-    text = re.sub(r':\s*(-?\d+\.?\d*)', f': {c_white}\\1{c_reset}', text)
-    text = re.sub(r':\s*(true|false|null)', f': {c_white}\\1{c_reset}', text)
+    # Every pattern needs a ':'; skip passes whose literal can't be present.
+    if ":" not in text:
+        return text
+    if '"' in text:
+        text = _JSON_KEY_RE.sub(f'{c_cyan}\\1{c_reset}{c_white}:{c_reset}', text)
+        text = _JSON_STR_VAL_RE.sub(f': {c_white}\\1{c_reset}', text)
+    text = _JSON_NUM_RE.sub(f': {c_white}\\1{c_reset}', text)
+    if "true" in text or "false" in text or "null" in text:
+        text = _JSON_LIT_RE.sub(f': {c_white}\\1{c_reset}', text)
     return text
 
 def highlight_support_tags(text: str) -> str:
-    # Normalize common variants (so old logs still color nicely)
-    text = re.sub(r"\[\s*!!\s*UNSUPPORTED\s*!!\s*\]", "[UNSUPPORTED]", text)
-    text = re.sub(r"\[\s*SUPPORTED\s*\]", "[SUPPORTED]", text)
-
-    # Colorize tags anywhere in the line
-    text = re.sub(
-        r"\[UNSUPPORTED\]",
-        f"{c_white}[{c_reset}{c_yellow}UNSUPPORTED{c_reset}{c_white}]{c_reset}",
-        text,
-    )
-    text = re.sub(
-        r"\[SUPPORTED\]",
-        f"{c_white}[{c_reset}{c_green}SUPPORTED{c_reset}{c_white}]{c_reset}",
-        text,
-    )
+    # Both tags contain "SUPPORTED"; most lines have neither.
+    if "SUPPORTED" not in text:
+        return text
+
+    # Colorize tags anywhere in the line (common variants included, so old logs still color nicely)
+    text = _UNSUP_TAG_RE.sub(_TAG_UNSUPPORTED, text)
+    text = _SUP_TAG_RE.sub(_TAG_SUPPORTED, text)
     return text
 
 def timestamped_print(*args, **kwargs):
-    now = datetime.now().strftime("%H:%M:%S")
-    time_prefix = f"{c_dim}[{now}]{c_reset}"
+    now = _log_time()
     msg = " ".join(map(str, args))
     lower_msg = msg.lower()
     
-    header = f"{c_green}INFO{c_reset}{c_white}:{c_reset}" 
+    header = _HDR_INFO
     special_formatting_applied = False
     
-    if any(x in lower_msg for x in ["error", "critical", "failed", "crashed"]):
-        header = f"{c_red}ERROR{c_reset}{c_white}:{c_reset}"
+    if ("error" in lower_msg or "critical" in lower_msg
+            or "failed" in lower_msg or "crashed" in lower_msg):
+        header = _HDR_ERROR
         msg = msg.replace("CRITICAL:", "").replace("ERROR:", "").strip()
     elif "warning" in lower_msg:
-        header = f"{c_yellow}WARN{c_reset}{c_white}:{c_reset}"
+        header = _HDR_WARN
         msg = msg.replace("WARNING:", "").strip()
     elif "debug" in lower_msg:
-        header = f"{c_magenta}DEBUG{c_reset}{c_white}:{c_reset}"
+        header = _HDR_DEBUG
         msg = msg.replace("[DEBUG]", "").replace("[debug]", "").strip()
         if "{" in msg and "}" in msg: msg = highlight_json(msg)
     elif "-> tx" in lower_msg:
-        header = f"{c_green}DATA{c_reset}{c_white}:{c_reset}"
+        header = _HDR_DATA
         msg = msg.replace("-> TX", "").strip()
-        match = re.match(r".*?\[(.*?)(?:\])?:\s+(.*)", msg)
+        match = _TX_MATCH_RE.match(msg)
         if match:
             src_text = match.group(1).replace("]", "")
             val = match.group(2)
-            msg = f"{c_white}[{c_reset}{c_cyan}{src_text}{c_reset}{c_white}]:{c_reset} {c_white}{val}{c_reset}"
+            msg = f"{_BRK_OPEN}{c_cyan}{src_text}{_BRK_CLOSE}{c_white}{val}{c_reset}"
             special_formatting_applied = True
 
     if not special_formatting_applied:
-        match = re.match(r"^\[(.*?)\]\s*(.*)", msg)
+        match = _BRACKET_RE.match(msg)
         if match:
             src_text = match.group(1)
             rest_of_msg = match.group(2)
-            rest_of_msg = re.sub(r"^(RX:?|:)\s*", "", rest_of_msg).strip()
+            # Drop a leading "RX", "RX:" or ":" after the tag
+            if rest_of_msg.startswith("RX:"):
+                rest_of_msg = rest_of_msg[3:]
+            elif rest_of_msg.startswith("RX"):
+                rest_of_msg = rest_of_msg[2:]
+            elif rest_of_msg.startswith(":"):
+                rest_of_msg = rest_of_msg[1:]
+            rest_of_msg = rest_of_msg.strip()
             s_color = get_source_color(src_text)
-            msg = f"{c_white}[{c_reset}{s_color}{src_text}{c_reset}{c_white}]:{c_reset} {rest_of_msg}"
+            msg = f"{_BRK_OPEN}{s_color}{src_text}{_BRK_CLOSE}{rest_of_msg}"
 
         msg = highlight_support_tags(msg)
-    _original_print(f"{time_prefix} {header} {msg}", flush=True, **kwargs)
+    # A single f-string compiles to one BUILD_STRING join; no separate prefix string.
+    _original_print(f"{c_dim}[{now}]{c_reset} {header} {msg}", flush=True, **kwargs)
 
 builtins.print = timestamped_print
 
 def check_dependencies():
-    if not subprocess.run(["which", "rtl_433"], capture_output=True).stdout:
+    if shutil.which("rtl_433") is None:
         print("CRITICAL: 'rtl_433' binary not found. Please install it.")
         sys.exit(1)
     if importlib.util.find_spec("paho") is None:
@@ -133,7 +175,7 @@ from utils import (
 )
 from system_monitor import system_stats_loop
 from data_processor import DataProcessor
-from rtl_manager import rtl_loop, discover_rtl_devices
+from rtl_manager import rtl_loop, discover_rtl_devices, wait_radio_ready
 
 def get_version():
     """Return display version for logs/device info.
@@ -152,12 +194,14 @@ def get_version():
         try:
             cfg_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "config.yaml")
             if os.path.exists(cfg_path):
-                with open(cfg_path, "r", encoding="utf-8") as f:
-                    for line in f:
-                        if line.strip().startswith("version:"):
-                            ver = line.split(':', 1)[1].strip()
-                            ver = ver.strip().strip('"').strip("'")
-                            return f"v{ver}"
+                with open(cfg_path, "rb") as f:
+                    data = f.read()
+                # One bytes scan; only the value itself gets decoded.
+                m = re.search(rb"^\s*version:(.*)$", data, re.MULTILINE)
+                if m:
+                    ver = m.group(1).decode("utf-8", "replace").strip()
+                    ver = ver.strip('"').strip("'")
+                    return f"v{ver}"
         except Exception:
             pass
     return "Unknown"
@@ -171,8 +215,10 @@ def show_logo(version):
         r"  |  _ <  | |  | | |___| |  _  |/ ___ \ |_| |___) |",
         r"  |_| \_\ |_|  |_____|   |_| |_/_/   \_\___/|____/ "
     ]
-    for line in logo_lines: sys.stdout.write(f"{c_blue}{line}{c_reset}\n")
-    sys.stdout.write(f"\n{c_cyan}>>> RTL-SDR Bridge for Home Assistant ({c_reset}{c_yellow}{version}{c_reset}{c_cyan}) <<<{c_reset}\n\n\n")
+    logo = "".join(f"{c_blue}{line}{c_reset}\n" for line in logo_lines)
+    sys.stdout.write(
+        f"{logo}\n{c_cyan}>>> RTL-SDR Bridge for Home Assistant ({c_reset}{c_yellow}{version}{c_reset}{c_cyan}) <<<{c_reset}\n\n\n"
+    )
     sys.stdout.flush()
 
 def main():
@@ -193,15 +239,18 @@ def main():
     print("[STARTUP] Scanning USB bus for RTL-SDR devices...")
     detected_devices = discover_rtl_devices()
     
-    # If multiple dongles share the same USB serial (e.g., '00000001'), append index
-    # (e.g., '00000001-1') so they don't overwrite each other in the hardware map.
-    _seen_usb = {}
+    # One pass: dedupe serials, log each SDR, flag ID collisions and build the hardware map.
+    seen_usb = set()
+    seen_ids = set()
+    warned_ids = set()
+    serial_to_index = {}
     for d in detected_devices:
         # Preserve the raw dongle-reported serial separately
-        d.setdefault("usb_serial", str(d.get("id", "")).strip())
+        usb = d.setdefault("usb_serial", str(d.get("id", "")).strip())
 
-        usb = d["usb_serial"]
-        if usb in _seen_usb:
+        # If multiple dongles share the same USB serial (e.g., '00000001'), append index
+        # (e.g., '00000001-1') so they don't overwrite each other in the hardware map.
+        if usb in seen_usb:
             new_id = f"{usb}-{d.get('index')}"
             d["id"] = new_id
             print(
@@ -210,34 +259,24 @@ def main():
             )
         else:
             d["id"] = usb
+        seen_usb.add(usb)
 
-        _seen_usb[usb] = True
-
-
-    for d in detected_devices:
         print(
             f"[STARTUP] SDR index {d.get('index')}: "
             f"USB Serial {d.get('usb_serial')} (ID {d.get('id')}) Name {d.get('name')}"
         )
 
+        # --- Check for Physical Duplicates (Hardware) ---
+        sid = str(d["id"])
+        if sid in seen_ids and sid not in warned_ids:
+            warned_ids.add(sid)
+            print(f"[STARTUP] WARNING: [Hardware] Multiple SDRs detected with same Serial '{sid}'. IDs must be unique for precise mapping. Use rtl_eeprom to fix.")
+        seen_ids.add(sid)
 
-    # --- Check for Physical Duplicates (Hardware) ---
-    serial_counts = {}
-    if detected_devices:
-        for d in detected_devices:
-            sid = str(d.get('id', ''))
-            serial_counts[sid] = serial_counts.get(sid, 0) + 1
-            if 'id' in d and 'index' in d: pass 
-
-        for sid, count in serial_counts.items():
-            if count > 1:
-                print(f"[STARTUP] WARNING: [Hardware] Multiple SDRs detected with same Serial '{sid}'. IDs must be unique for precise mapping. Use rtl_eeprom to fix.")
+        if 'index' in d:
+            serial_to_index[sid] = d['index']
 
-    serial_to_index = {}
     if detected_devices:
-        for d in detected_devices:
-            if 'id' in d and 'index' in d:
-                serial_to_index[str(d['id'])] = d['index']
         print(f"[STARTUP] Hardware Map: {serial_to_index}")
     else:
         # --- NEW WARNING: No Hardware Found ---
@@ -280,12 +319,14 @@ def main():
                 if target_id:
                      print(f"[STARTUP] Warning: Configured Serial {target_id} not found in scan. Driver may fail.")
 
+            # Stagger starts so dongles don't race for USB, but only until this one is up.
+            ready = threading.Event()
             threading.Thread(
                 target=rtl_loop,
-                args=(radio, mqtt_handler, processor, sys_id, sys_model),
+                args=(radio, mqtt_handler, processor, sys_id, sys_model, ready),
                 daemon=True,
             ).start()
-            time.sleep(5)
+            wait_radio_ready(ready)
             
         if detected_devices:
             for d in detected_devices:
@@ -301,6 +342,9 @@ def main():
             # Auto Multi-Radio: if a 2nd dongle is present, start a second rtl_433 instance automatically.
             if getattr(config, "RTL_AUTO_MULTI", False) and len(detected_devices) > 1:
                 max_radios_cfg = getattr(config, "RTL_AUTO_MAX_RADIOS", 0)
+                # Read once; reused by the cap logging and the radio #2/#3 plans below.
+                hard_cap_cfg = getattr(config, "RTL_AUTO_HARD_CAP", 3)
+                sec_rate = getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k")
                 try:
                     max_radios_cfg = int(max_radios_cfg)
                 except Exception:
@@ -310,7 +354,7 @@ def main():
                 #   0 -> use detected count (bounded by RTL_AUTO_HARD_CAP)
                 #  >0 -> start that many (bounded by available dongles)
                 if max_radios_cfg <= 0:
-                    hard_cap = getattr(config, "RTL_AUTO_HARD_CAP", 3)
+                    hard_cap = hard_cap_cfg
                     try:
                         hard_cap = int(hard_cap)
                     except Exception:
@@ -323,7 +367,7 @@ def main():
 
                 if max_radios_cfg <= 0:
                     try:
-                        hard_cap_disp = int(getattr(config, "RTL_AUTO_HARD_CAP", 3) or 3)
+                        hard_cap_disp = int(hard_cap_cfg or 3)
                     except Exception:
                         hard_cap_disp = 3
                     print(
@@ -401,7 +445,7 @@ def main():
                     radio2 = {
                         "slot": 1,
                         "hop_interval": hop2,
-                        "rate": getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k"),
+                        "rate": sec_rate,
                         "freq": freq2,
                     }
                     radio2.update(dev2)
@@ -420,7 +464,14 @@ def main():
                         if not freq3:
                             hopper_override = str(getattr(config, "RTL_AUTO_HOPPER_FREQS", "") or "").strip()
                             hopper_hop = int(getattr(config, "RTL_AUTO_HOPPER_HOP_INTERVAL", 20) or 20)
-                            hopper_rate = getattr(config, "RTL_AUTO_HOPPER_RATE", getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k"))
+                            hopper_rate = getattr(config, "RTL_AUTO_HOPPER_RATE", sec_rate)
+
+                            # Bands already covered by Radio #1/#2 (lowercased once, used twice below).
+                            used_freqs = {
+                                s.strip().lower()
+                                for s in f"{radio1.get('freq', '')},{freq2}".split(",")
+                                if s.strip()
+                            }
 
                             # Only auto-derive hopper freqs if we actually know the country.
                             if hopper_override:
@@ -428,13 +479,7 @@ def main():
                             elif country:
                                 # Derive a regional hopper plan that does NOT overlap with the
                                 # primary/secondary radios.
-                                used = {
-                                    s.strip().lower()
-                                    for s in str(radio1.get("freq", "")).split(",")
-                                    if s.strip()
-                                }
-                                used.update({s.strip().lower() for s in str(freq2).split(",") if s.strip()})
-                                hopper_freq = choose_hopper_band_defaults(country_code=country, used_freqs=used)
+                                hopper_freq = choose_hopper_band_defaults(country_code=country, used_freqs=used_freqs)
                             else:
                                 hopper_freq = None
 
@@ -449,19 +494,13 @@ def main():
                                 else:
                                     hopper_freq = "915M"
                                 hopper_hop = 0
-                                hopper_rate = getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k")
+                                hopper_rate = sec_rate
 
                             # If only one frequency remains, disable hopping.
                             hopper_list = [s.strip() for s in str(hopper_freq).split(",") if s.strip()]
 
                             # Avoid hopping onto a band we already cover with Radio #1/#2.
-                            used_freqs = {
-                                s.strip().lower() for s in str(radio1.get("freq", "")).split(",") if s.strip()
-                            }
-                            used_freqs.update(
-                                {s.strip().lower() for s in str(freq2).split(",") if s.strip()}
-                            )
-                            filtered = [f for f in hopper_list if f.strip().lower() not in used_freqs]
+                            filtered = [f for f in hopper_list if f.lower() not in used_freqs]
                             hopper_list = filtered
 
                             # If nothing remains after filtering, we refuse to overlap.
@@ -488,7 +527,7 @@ def main():
                             rate3 = hopper_rate
                         else:
                             hop3 = 0
-                            rate3 = getattr(config, "RTL_AUTO_SECONDARY_RATE", "1024k")
+                            rate3 = sec_rate
 
                         if not dev3 or not freq3:
                             # Nothing to start for Radio #3.
@@ -521,12 +560,13 @@ def main():
                     )
 
 
+                    ready = threading.Event()
                     threading.Thread(
                         target=rtl_loop,
-                        args=(r, mqtt_handler, processor, sys_id, sys_model),
+                        args=(r, mqtt_handler, processor, sys_id, sys_model, ready),
                         daemon=True,
                     ).start()
-                    time.sleep(5)
+                    wait_radio_ready(ready)
 
                 if len(detected_devices) > len(radios):
                     print(
@@ -605,7 +645,10 @@ def main():
     try:
         while True: time.sleep(1)
     except KeyboardInterrupt:
-        print("\n[SHUTDOWN] Stopping MQTT...")
+        # Publish throttled readings while MQTT is still connected.
+        print("\n[SHUTDOWN] Flushing buffered readings...")
+        processor.stop()
+        print("[SHUTDOWN] Stopping MQTT...")
         mqtt_handler.stop()
 
 if __name__ == "__main__":
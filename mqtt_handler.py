@@ -6,6 +6,7 @@ DESCRIPTION:
   - UPDATED: Removed legacy gas normalization. Now reports RAW meter values (ft3).
 """
 import json
+import socket
 import threading
 import sys
 import time
@@ -66,29 +67,33 @@ ERT_TYPE_COMMODITY = {
     "water": {3, 11, 13},
 }
 
+# Flat lookups built once (these helpers run for every utility-meter field).
+_ERT_TYPE_TO_COMMODITY = {t: commodity for commodity, typeset in ERT_TYPE_COMMODITY.items() for t in typeset}
+
+# Lowercased textual commodity names -> commodity
+_COMMODITY_BY_NAME = {
+    "electric": "electric",
+    "electricity": "electric",
+    "energy": "electric",
+    "power": "electric",
+    "gas": "gas",
+    "natural gas": "gas",
+    "water": "water",
+}
+
 def infer_commodity_from_ert_type(value):
     """Return 'electric'|'gas'|'water' for known ERT type values, else None."""
     try:
         t = int(value)
     except (TypeError, ValueError):
         return None
-    for commodity, typeset in ERT_TYPE_COMMODITY.items():
-        if t in typeset:
-            return commodity
-    return None
+    return _ERT_TYPE_TO_COMMODITY.get(t)
 
 def infer_commodity_from_meter_type(value):
     """Return commodity from textual MeterType fields (e.g., 'Gas', 'Water', 'Electric')."""
     if not isinstance(value, str):
         return None
-    v = value.strip().lower()
-    if v in {"electric", "electricity", "energy", "power"}:
-        return "electric"
-    if v in {"gas", "natural gas"}:
-        return "gas"
-    if v in {"water"}:
-        return "water"
-    return None
+    return _COMMODITY_BY_NAME.get(value.strip().lower())
 
 
 def infer_commodity_from_type_field(value):
@@ -106,15 +111,38 @@ def infer_commodity_from_type_field(value):
 
     if not isinstance(value, str):
         return None
-    v = value.strip().lower()
-    if v in {"electric", "electricity", "energy", "power"}:
-        return "electric"
-    if v in {"gas", "natural gas"}:
-        return "gas"
-    if v in {"water"}:
-        return "water"
-    return None
+    return _COMMODITY_BY_NAME.get(value.strip().lower())
+
+
 
+# Field names / device classes tested on every reading.
+_UTILITY_TOTAL_FIELDS = frozenset({"Consumption", "consumption", "consumption_data", "meter_reading"})
+_ERT_TYPE_FIELDS = frozenset({"ert_type", "ertType", "ERTType"})
+_METER_TYPE_FIELDS = frozenset({"MeterType", "meter_type", "metertype"})
+_TYPE_FIELDS = frozenset({"type", "Type"})
+_UTILITY_DEVICE_CLASSES = frozenset({"gas", "energy", "water"})
+_TOTAL_INCREASING_CLASSES = frozenset({"gas", "energy", "water", "monetary", "precipitation"})
+_MEASUREMENT_CLASSES = frozenset({"temperature", "humidity", "pressure", "illuminance", "voltage", "wind_speed", "moisture"})
+
+# Discovery metadata (unit, device_class, icon, friendly_name) for utility meter totals.
+_UTILITY_META_ELECTRIC = ("kWh", "energy", "mdi:flash", "Energy Reading")
+_UTILITY_META_GAS_CCF = ("CCF", "gas", "mdi:fire", "Gas Usage")
+_UTILITY_META_GAS_FT3 = ("ft³", "gas", "mdi:fire", "Gas Usage")
+_UTILITY_META_WATER_GAL = ("gal", "water", "mdi:water-pump", "Water Usage")
+_UTILITY_META_WATER_FT3 = ("ft³", "water", "mdi:water-pump", "Water Reading")
+
+
+# Kernel send buffer for the broker socket. Reconnects (and nuke restores) publish a
+# burst of retained discovery configs; a larger buffer keeps paho's network thread
+# from stalling on TCP backpressure while the broker catches up.
+MQTT_SNDBUF_BYTES = 2 * 1024 * 1024
+
+
+# Lowercased textual booleans accepted by _parse_boolish
+_BOOLISH_STRINGS = {
+    "1": True, "true": True, "on": True, "yes": True, "ok": True, "good": True,
+    "0": False, "false": False, "off": False, "no": False, "low": False, "bad": False,
+}
 
 
 def _parse_boolish(value):
@@ -131,11 +159,7 @@ def _parse_boolish(value):
     if isinstance(value, (int, float)):
         return value != 0
     if isinstance(value, str):
-        v = value.strip().lower()
-        if v in {"1", "true", "on", "yes", "ok", "good"}:
-            return True
-        if v in {"0", "false", "off", "no", "low", "bad"}:
-            return False
+        return _BOOLISH_STRINGS.get(value.strip().lower())
     return None
 
 class HomeNodeMQTT:
@@ -150,6 +174,9 @@ class HomeNodeMQTT:
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
 
+        # Host system ID used by the button configs; fixed for the process lifetime.
+        self._sys_id = get_system_mac().replace(":", "").lower()
+
         self.discovery_published = set()
         self.last_sent_values = {}
         self.tracked_devices = set()
@@ -167,14 +194,18 @@ class HomeNodeMQTT:
         # Used to correctly classify generic fields like 'consumption_data' for ERT-SCM endpoints.
         self._commodity_by_device = {}  # clean_id -> 'electric'|'gas'|'water'
 
+        # Gas unit preference is startup config; resolve it once instead of per reading.
+        gas_unit = str(getattr(config.settings, "gas_unit", "ft3") or "ft3").strip().lower()
+        self._gas_unit_ccf = gas_unit in {"ccf", "centum_cubic_feet"}
+
         # Remember the last device model we saw per device.
         # Used for model-specific unit overrides (e.g., Neptune-R900 reports gallons).
         self._device_model_by_id: dict[str, str] = {}
 
         # Remember last raw utility readings so we can re-publish state/config
         # once we learn commodity (or unit preferences) from later fields.
-        # Key: (clean_id, field) -> raw_value
-        self._utility_last_raw = {}
+        # Key: clean_id -> {field: raw_value}
+        self._utility_last_raw: dict[str, dict] = {}
 
         # Cache the last discovery signature we published per entity so we can
         # safely update HA discovery when metadata changes (e.g., gas -> energy).
@@ -196,18 +227,15 @@ class HomeNodeMQTT:
             return None
 
         if commodity == "electric":
-            return ("kWh", "energy", "mdi:flash", "Energy Reading")
+            return _UTILITY_META_ELECTRIC
         if commodity == "gas":
-            gas_unit = str(getattr(config.settings, "gas_unit", "ft3") or "ft3").strip().lower()
-            if gas_unit in {"ccf", "centum_cubic_feet"}:
-                return ("CCF", "gas", "mdi:fire", "Gas Usage")
-            return ("ft³", "gas", "mdi:fire", "Gas Usage")
+            return _UTILITY_META_GAS_CCF if self._gas_unit_ccf else _UTILITY_META_GAS_FT3
         if commodity == "water":
             # Neptune R900 (protocol 228) typically reports gallons (often in tenths, normalized upstream).
             model = str(self._device_model_by_id.get(clean_id, "") or "").strip()
             if field == "meter_reading" and model.lower().startswith("neptune-r900"):
-                return ("gal", "water", "mdi:water-pump", "Water Usage")
-            return ("ft³", "water", "mdi:water-pump", "Water Reading")
+                return _UTILITY_META_WATER_GAL
+            return _UTILITY_META_WATER_FT3
         return None
     def _utility_normalize_value(self, clean_id: str, field: str, value, device_model: str):
         """Normalize utility readings *after* commodity is known.
@@ -221,7 +249,7 @@ class HomeNodeMQTT:
             return value
 
         # Only normalize the main utility total fields.
-        if field not in {"Consumption", "consumption", "consumption_data", "meter_reading"}:
+        if field not in _UTILITY_TOTAL_FIELDS:
             return value
 
         try:
@@ -240,8 +268,7 @@ class HomeNodeMQTT:
         if commodity == "gas":
             # rtlamr/rtl_433 commonly reports the raw counter in ft³ (which is also 0.01 CCF).
             # If you prefer billing units (CCF), we publish CCF by dividing by 100.
-            gas_unit = str(getattr(config.settings, "gas_unit", "ft3") or "ft3").strip().lower()
-            if gas_unit in {"ccf", "centum_cubic_feet"}:
+            if self._gas_unit_ccf:
                 return round(v * 0.01, 2)
             # Default: publish ft³
             return v
@@ -257,15 +284,31 @@ class HomeNodeMQTT:
         published (e.g., MeterType arrives after Consumption). Without this, HA would
         keep the first-discovered device_class/unit.
         """
-        for (cid, field), raw_value in list(self._utility_last_raw.items()):
-            if cid != clean_id:
-                continue
+        # Snapshot: send_sensor writes back into this device's dict.
+        for field, raw_value in list(self._utility_last_raw.get(clean_id, {}).items()):
             # Use is_rtl=False so we only publish if it actually changes.
             self.send_sensor(clean_id, field, raw_value, device_name, device_model, is_rtl=False)
 
 
+    def _tune_socket(self, c):
+        """Best-effort socket tuning for the broker connection."""
+        get_sock = getattr(c, "socket", None)
+        if not callable(get_sock):
+            return
+        try:
+            sock = get_sock()
+            if sock is not None:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, MQTT_SNDBUF_BYTES)
+                # Publishes are small and fire-and-forget (QoS 0); don't let Nagle hold
+                # them back waiting to coalesce with the next write.
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except Exception:
+            # Not all transports expose a tunable socket (e.g. websockets, test stubs).
+            pass
+
     def _on_connect(self, c, u, f, rc, p=None):
         if rc == 0:
+            self._tune_socket(c)
             c.publish(self.TOPIC_AVAILABILITY, "online", retain=True)
             print("[MQTT] Connected Successfully.")
             
@@ -301,6 +344,11 @@ class HomeNodeMQTT:
                 if not msg.payload: return
 
                 try:
+                    # SAFETY: Don't delete the buttons! Checked before parsing the payload,
+                    # since these topics are skipped whatever they contain.
+                    topic = msg.topic
+                    if "nuke" in topic or "restart" in topic: return
+
                     payload_str = msg.payload.decode("utf-8")
                     data = json.loads(payload_str)
                     
@@ -309,12 +357,8 @@ class HomeNodeMQTT:
                     manufacturer = device_info.get("manufacturer", "")
 
                     if "rtl-haos" in manufacturer:
-                        # SAFETY: Don't delete the buttons!
-                        if "nuke" in msg.topic or "rtl_bridge_nuke" in str(msg.topic): return
-                        if "restart" in msg.topic or "rtl_bridge_restart" in str(msg.topic): return
-
-                        print(f"[NUKE] FOUND & DELETING: {msg.topic}")
-                        self.client.publish(msg.topic, "", retain=True)
+                        print(f"[NUKE] FOUND & DELETING: {topic}")
+                        self.client.publish(topic, "", retain=True)
                 except Exception:
                     pass
 
@@ -323,7 +367,7 @@ class HomeNodeMQTT:
 
     def _publish_nuke_button(self):
         """Creates the 'Delete Entities' button."""
-        sys_id = get_system_mac().replace(":", "").lower()
+        sys_id = self._sys_id
         unique_id = f"rtl_bridge_nuke{config.ID_SUFFIX}"
         
         payload = {
@@ -347,7 +391,7 @@ class HomeNodeMQTT:
 
     def _publish_restart_button(self):
         """Creates the 'Restart Radios' button."""
-        sys_id = get_system_mac().replace(":", "").lower()
+        sys_id = self._sys_id
         unique_id = f"rtl_bridge_restart{config.ID_SUFFIX}"
         
         payload = {
@@ -445,8 +489,9 @@ class HomeNodeMQTT:
         with self.discovery_lock:
 
             default_meta = (None, "none", "mdi:eye", sensor_name.replace("_", " ").title())
-            
-            if sensor_name.startswith("radio_status"):
+            is_radio_status = sensor_name.startswith("radio_status")
+
+            if is_radio_status:
                 base_meta = FIELD_META.get("radio_status", default_meta)
                 unit, device_class, icon, default_fname = base_meta
             else:
@@ -460,7 +505,7 @@ class HomeNodeMQTT:
 
             if friendly_name_override:
                 friendly_name = friendly_name_override
-            elif sensor_name.startswith("radio_status_"):
+            elif is_radio_status and sensor_name.startswith("radio_status_"):
                 suffix = sensor_name.replace("radio_status_", "")
                 friendly_name = f"{default_fname} {suffix}"
             else:
@@ -469,13 +514,46 @@ class HomeNodeMQTT:
             entity_cat = "diagnostic"
             if sensor_name in getattr(config, 'MAIN_SENSORS', []):
                 entity_cat = None 
-            if sensor_name.startswith("radio_status"):
+            if is_radio_status:
                 entity_cat = None
 
             # Utility meters should not be categorized as diagnostic.
-            if device_class in ["gas", "energy", "water"]:
+            if device_class in _UTILITY_DEVICE_CLASSES:
                 entity_cat = None
 
+            # Sensor-only fields
+            state_class = None
+            if domain == "sensor":
+                if device_class in _TOTAL_INCREASING_CLASSES:
+                    state_class = "total_increasing"
+                elif device_class in _MEASUREMENT_CLASSES:
+                    state_class = "measurement"
+                elif device_class == "wind_direction":
+                    state_class = "measurement_angle"
+
+            # Signature for safe updates: if this changes, we re-publish the retained config.
+            # Built from the same values the payload gets, before the payload itself, so the
+            # common "already published" path skips building (and serializing) it.
+            sig_values = {
+                "device_class": device_class if device_class != "none" else None,
+                "unit_of_measurement": (unit or None) if domain == "sensor" else None,
+                "icon": icon,
+                "name": friendly_name,
+                "entity_category": entity_cat or None,
+                "state_class": state_class,
+            }
+            if extra_payload:
+                for key in sig_values:
+                    if key in extra_payload:
+                        sig_values[key] = extra_payload[key]
+            sig = (domain, *sig_values.values())
+
+            prev_sig = self._discovery_sig.get(unique_id)
+            if prev_sig == sig:
+                # Already published with identical metadata.
+                self.discovery_published.add(unique_id)
+                return False
+
             device_registry = {
                 "identifiers": [f"rtl433_{device_model}_{unique_id.split('_')[0]}"],
                 "manufacturer": "rtl-haos",
@@ -485,8 +563,7 @@ class HomeNodeMQTT:
 
             if device_model != config.BRIDGE_NAME:
                 device_registry["via_device"] = "rtl433_"+config.BRIDGE_NAME+"_"+config.BRIDGE_ID
-            
-            if device_model == config.BRIDGE_NAME:
+            else:
                 device_registry["sw_version"] = self.sw_version
 
             payload = {
@@ -507,18 +584,13 @@ class HomeNodeMQTT:
             if domain == "sensor":
                 if unit:
                     payload["unit_of_measurement"] = unit
-
-                if device_class in ["gas", "energy", "water", "monetary", "precipitation"]:
-                    payload["state_class"] = "total_increasing"
-                if device_class in ["temperature", "humidity", "pressure", "illuminance", "voltage", "wind_speed", "moisture"]:
-                    payload["state_class"] = "measurement"
-                if device_class in ["wind_direction"]:
-                    payload["state_class"] = "measurement_angle"
+                if state_class:
+                    payload["state_class"] = state_class
 
             if extra_payload:
                 payload.update(extra_payload)
 
-            if "version" not in sensor_name.lower() and not sensor_name.startswith("radio_status"):
+            if not is_radio_status and "version" not in sensor_name.lower():
                 # Battery status is often reported infrequently; avoid flapping to "unavailable".
                 if sensor_name == "battery_ok":
                     payload["expire_after"] = max(int(config.RTL_EXPIRE_AFTER), 86400)
@@ -527,23 +599,6 @@ class HomeNodeMQTT:
             
             payload["availability_topic"] = self.TOPIC_AVAILABILITY
 
-            # Signature for safe updates: if this changes, we re-publish the retained config.
-            sig = (
-                domain,
-                payload.get("device_class"),
-                payload.get("unit_of_measurement"),
-                payload.get("icon"),
-                payload.get("name"),
-                payload.get("entity_category"),
-                payload.get("state_class"),
-            )
-
-            prev_sig = self._discovery_sig.get(unique_id)
-            if prev_sig == sig:
-                # Already published with identical metadata.
-                self.discovery_published.add(unique_id)
-                return False
-
             config_topic = f"homeassistant/{domain}/{unique_id}/config"
             self.client.publish(config_topic, json.dumps(payload), retain=True)
             self.discovery_published.add(unique_id)
@@ -559,12 +614,16 @@ class HomeNodeMQTT:
         clean_id = clean_mac(sensor_id) 
         
         # Remember model for model-specific discovery/unit overrides.
-        self._device_model_by_id[clean_id] = str(device_model)
+        # Compare in the stored (str) form so an unchanged model skips the dict store.
+        model_str = str(device_model)
+        if self._device_model_by_id.get(clean_id) != model_str:
+            self._device_model_by_id[clean_id] = model_str
 
         unique_id_base = clean_id
         state_topic_base = clean_id
 
         unique_id = f"{unique_id_base}_{field}"
+        unique_id_v2 = f"{unique_id}{config.ID_SUFFIX}"
         state_topic = f"home/rtl_devices/{state_topic_base}/{field}"
 
         # Field-specific transforms / entity types
@@ -573,8 +632,8 @@ class HomeNodeMQTT:
         out_value = value
 
         # Remember raw utility readings so we can re-publish once commodity metadata is known.
-        if field in {"Consumption", "consumption", "consumption_data", "meter_reading"}:
-            self._utility_last_raw[(clean_id, field)] = value
+        if field in _UTILITY_TOTAL_FIELDS:
+            self._utility_last_raw.setdefault(clean_id, {})[field] = value
 
 
         # Commodity-aware normalization for utility meters:
@@ -585,15 +644,15 @@ class HomeNodeMQTT:
         prev_commodity = self._commodity_by_device.get(clean_id)
 
         commodity_update = None
-        if field in {"ert_type", "ertType", "ERTType"}:
+        if field in _ERT_TYPE_FIELDS:
             commodity_update = infer_commodity_from_ert_type(value)
 
-        if commodity_update is None and field in {"MeterType", "meter_type", "metertype"}:
+        if commodity_update is None and field in _METER_TYPE_FIELDS:
             commodity_update = infer_commodity_from_meter_type(value)
 
         # Some decoders publish commodity hints in a generic 'type' field.
         # Only treat it as a utility hint when it looks like a commodity.
-        if commodity_update is None and field in {"type", "Type"}:
+        if commodity_update is None and field in _TYPE_FIELDS:
             commodity_update = infer_commodity_from_type_field(value)
 
         if commodity_update and commodity_update != prev_commodity:
@@ -602,12 +661,10 @@ class HomeNodeMQTT:
             self._refresh_utility_entities_for_device(clean_id, device_name, device_model)
 
         meta_override = None
-        if field in {"Consumption", "consumption", "consumption_data", "meter_reading"}:
+        if field in _UTILITY_TOTAL_FIELDS:
             meta_override = self._utility_meta_override(clean_id, field)
 
-
-        # Apply commodity-aware normalization for utility meter readings.
-        if field in {"Consumption", "consumption", "consumption_data", "meter_reading"}:
+            # Apply commodity-aware normalization for utility meter readings.
             out_value = self._utility_normalize_value(clean_id, field, out_value, device_model)
 
         # battery_ok: 1/True => battery OK, 0/False => battery LOW
@@ -619,7 +676,6 @@ class HomeNodeMQTT:
             if ok is None:
                 return
 
-            now = time.time()
             st = self._battery_state.setdefault(
                 clean_id,
                 {
@@ -630,8 +686,9 @@ class HomeNodeMQTT:
                 },
             )
 
-            # Update latch
+            # Update latch (time.time() only on branches that record or compare a timestamp)
             if not ok:
+                now = time.time()
                 st["latched_low"] = True
                 st["last_low"] = now
                 st["ok_candidate_since"] = None
@@ -639,6 +696,7 @@ class HomeNodeMQTT:
                 low = True
             else:
                 if st.get("latched_low"):
+                    now = time.time()
                     if st.get("ok_candidate_since") is None:
                         st["ok_candidate_since"] = now
 
@@ -653,7 +711,7 @@ class HomeNodeMQTT:
                 else:
                     # Already OK and not latched
                     if st.get("ok_since") is None:
-                        st["ok_since"] = now
+                        st["ok_since"] = time.time()
                     low = False
 
             domain = "binary_sensor"
@@ -662,7 +720,6 @@ class HomeNodeMQTT:
 
             # Migration helper: if an older numeric sensor existed, remove its discovery config.
             # Only do this once per runtime to avoid extra traffic.
-            unique_id_v2 = f"{unique_id}{config.ID_SUFFIX}"
             if unique_id_v2 not in self.migration_cleared:
                 old_sensor_config = f"homeassistant/sensor/{unique_id_v2}/config"
                 self.client.publish(old_sensor_config, "", retain=True)
@@ -685,14 +742,14 @@ class HomeNodeMQTT:
             meta_override=meta_override,
         )
 
-        unique_id_v2 = f"{unique_id}{config.ID_SUFFIX}"
         value_changed = (self.last_sent_values.get(unique_id_v2) != out_value) or bool(discovery_published_now)
 
         if value_changed or is_rtl:
             self.client.publish(state_topic, str(out_value), retain=True)
-            self.last_sent_values[unique_id_v2] = out_value
 
             if value_changed:
+                self.last_sent_values[unique_id_v2] = out_value
+
                 # --- NEW: Check Verbosity Setting ---
                 if config.VERBOSE_TRANSMISSIONS:
                     print(f" -> TX {device_name} [{field}]: {out_value}")
\ No newline at end of file
@@ -22,6 +22,9 @@ from utils import clean_mac, calculate_dew_point
 # --- Process Tracking ---
 ACTIVE_PROCESSES = []
 
+# Upper bound main() waits for a radio to claim its dongle before starting the next one.
+RADIO_READY_TIMEOUT = 5.0
+
 
 def _format_cmd(cmd: list[str]) -> str:
     """Format a command list into a copy/paste-friendly shell line."""
@@ -753,7 +756,20 @@ def discover_rtl_devices():
     return devices
 
 
-def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_model: str) -> None:
+def wait_radio_ready(ready) -> bool:
+    """Block until rtl_loop signals `ready` (or RADIO_READY_TIMEOUT elapses)."""
+    return ready.wait(RADIO_READY_TIMEOUT)
+
+
+def rtl_loop(
+    radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_model: str, ready=None
+) -> None:
+    """Run rtl_433 for one radio forever, restarting it when it exits.
+
+    If `ready` (a threading.Event) is given it is set once rtl_433 has tuned the
+    dongle (or streamed data), or after the first attempt ends, so callers can
+    start the next radio without racing for the USB device.
+    """
     radio_name = radio_config.get("name", "Unknown")
     radio_id = radio_config.get("id", "0")
 
@@ -836,6 +852,9 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                 try:
                     data = json.loads(raw)
 
+                    if ready is not None:
+                        ready.set()
+                        ready = None
                     data_raw = None
                     if getattr(config, "DEBUG_RAW_JSON", False):
                         try:
@@ -942,6 +961,11 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                     # Logs/errors from rtl_433 / librtlsdr
                     low = raw.lower()
 
+                    # "Tuned to ..." means rtl_433 holds the dongle now.
+                    if ready is not None and "tuned to" in low:
+                        ready.set()
+                        ready = None
+
                     # Ignore common noise
                     if "detached kernel driver" in low or "detaching kernel driver" in low:
                         continue
@@ -1006,6 +1030,11 @@ def rtl_loop(radio_config: dict, mqtt_handler, data_processor, sys_id: str, sys_
                         mqtt_handler, sys_id, sys_model, status_field, f"Error: rtl_433 exited ({rc})", friendly_name=status_friendly
                     )
 
+        # Startup failed or rtl_433 stopped; don't hold up the other radios.
+        if ready is not None:
+            ready.set()
+            ready = None
+
         last_online_mark = 0.0
         print(f"[RTL] {radio_name} crashed/stopped. Restarting in 5s...")
         time.sleep(5)
@@ -24,6 +24,14 @@ def _isolate_device_filters(monkeypatch):
     monkeypatch.setattr(config, "DEVICE_BLACKLIST", ["SimpliSafe*", "EezTire*"], raising=False)
 
 
+@pytest.fixture(autouse=True)
+def _no_radio_start_stagger(monkeypatch):
+    # Thread stubs never run rtl_loop, so nothing would ever signal readiness.
+    import rtl_manager
+
+    monkeypatch.setattr(rtl_manager, "RADIO_READY_TIMEOUT", 0)
+
+
 @pytest.fixture(autouse=True)
 def _clear_build_metadata_env(monkeypatch):
     """Keep tests deterministic regardless of the developer's shell env.
@@ -118,7 +118,7 @@ def test_start_throttle_loop_flushes_all_branches(monkeypatch, capsys):
         if calls["n"] >= 2:
             raise InterruptedError("stop loop")
 
-    monkeypatch.setattr(data_processor.time, "sleep", fake_sleep)
+    monkeypatch.setattr(dp._wakeup, "wait", fake_sleep)
 
     with pytest.raises(InterruptedError):
         dp.start_throttle_loop()
@@ -156,7 +156,7 @@ def test_start_throttle_loop_empty_buffer_continues(monkeypatch):
         if calls["n"] >= 2:
             raise InterruptedError("stop loop")
 
-    monkeypatch.setattr(data_processor.time, "sleep", fake_sleep)
+    monkeypatch.setattr(dp._wakeup, "wait", fake_sleep)
 
     with pytest.raises(InterruptedError):
         dp.start_throttle_loop()
@@ -187,9 +187,151 @@ def test_throttle_battery_ok_uses_last_value_not_mean(monkeypatch):
         if calls["n"] >= 2:
             raise InterruptedError("stop loop")
 
-    monkeypatch.setattr(data_processor.time, "sleep", fake_sleep)
+    monkeypatch.setattr(dp._wakeup, "wait", fake_sleep)
 
     with pytest.raises(InterruptedError):
         dp.start_throttle_loop()
 
     assert any(c["clean_id"] == "dev_batt" and c["field"] == "battery_ok" and c["value"] == 1 for c in mqtt.calls)
+
+
+def test_dispatch_reading_keeps_only_last_sample_for_non_averaged_fields(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 10)
+
+    dp = data_processor.DataProcessor(DummyMQTT())
+    for v in (1, 0, 1, 0):
+        dp.dispatch_reading("dev", "battery_ok", v, "Dev", "M", radio_name="R", radio_freq="433M")
+
+    assert list(dp.buffer["dev"]["battery_ok"]) == [0]
+
+
+def test_set_interval_switches_to_immediate_dispatch(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 10)
+
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    dp.set_interval(0)
+    dp.dispatch_reading("dev", "temp", 21.5, "Dev", "M")
+
+    assert dp.buffer == {}
+    assert [c["value"] for c in mqtt.calls] == [21.5]
+
+
+def test_stop_flushes_buffer_and_exits_loop(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 3600)
+
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    dp.dispatch_reading("dev", "temp", 20.0, "Dev", "M", radio_name="R", radio_freq="433M")
+
+    t = threading.Thread(target=dp.start_throttle_loop, daemon=True)
+    t.start()
+    dp.stop()
+    t.join(timeout=2)
+
+    assert not t.is_alive()
+    assert [(c["field"], c["value"]) for c in mqtt.calls] == [("temp", 20)]
+
+
+def test_dispatch_reading_keeps_only_last_sample_for_string_fields(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 10)
+
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    for v in ("OPEN", "CLOSED", "OPEN", "CLOSED"):
+        dp.dispatch_reading("dev", "status", v, "Dev", "M", radio_name="R", radio_freq="433M")
+
+    assert list(dp.buffer["dev"]["status"]) == ["CLOSED"]
+
+    dp.flush_once()
+    assert [(c["field"], c["value"]) for c in mqtt.calls] == [("status", "CLOSED")]
+
+
+def _wait_for(pred, timeout=2.0):
+    import time
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return pred()
+
+
+def test_set_interval_from_disabled_starts_flushing(monkeypatch):
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 0)
+
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    assert dp.start_throttle_loop() is None  # disabled at startup: no loop
+
+    dp.set_interval(0.05)
+    dp.dispatch_reading("dev", "temp", 20.0, "Dev", "M", radio_name="R", radio_freq="433M")
+
+    try:
+        assert _wait_for(lambda: mqtt.calls), "buffered reading was never flushed"
+        assert [(c["field"], c["value"]) for c in mqtt.calls] == [("temp", 20)]
+    finally:
+        dp.stop()
+
+
+def test_set_interval_shorter_applies_to_running_loop(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 3600)
+
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    t = threading.Thread(target=dp.start_throttle_loop, daemon=True)
+    t.start()
+    try:
+        assert _wait_for(lambda: dp._loop_running)
+        dp.set_interval(0.05)
+        dp.dispatch_reading("dev", "temp", 21.0, "Dev", "M", radio_name="R", radio_freq="433M")
+        # Well inside the old 3600s wait: only the new interval can flush it.
+        assert _wait_for(lambda: mqtt.calls), "loop kept waiting on the old interval"
+    finally:
+        dp.stop()
+        t.join(timeout=2)
+    assert not t.is_alive()
+
+
+def test_set_interval_to_zero_stops_loop_and_flushes(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 3600)
+
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    dp.dispatch_reading("dev", "temp", 19.0, "Dev", "M", radio_name="R", radio_freq="433M")
+    t = threading.Thread(target=dp.start_throttle_loop, daemon=True)
+    t.start()
+    assert _wait_for(lambda: dp._loop_running)
+
+    dp.set_interval(0)
+    t.join(timeout=2)
+
+    assert not t.is_alive()
+    assert dp._loop_running is False
+    assert [(c["field"], c["value"]) for c in mqtt.calls] == [("temp", 19)]
+
+
+def test_stop_waits_for_loop_thread_and_flushes_late_readings(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(config, "RTL_THROTTLE_INTERVAL", 3600)
+
+    mqtt = DummyMQTT()
+    dp = data_processor.DataProcessor(mqtt)
+    t = threading.Thread(target=dp.start_throttle_loop, daemon=True)
+    t.start()
+    assert _wait_for(lambda: dp._loop_running)
+
+    dp.dispatch_reading("dev", "temp", 22.0, "Dev", "M", radio_name="R", radio_freq="433M")
+    dp.stop()
+
+    # stop() returns only after the loop thread is done, with the reading published.
+    assert not t.is_alive()
+    assert [(c["field"], c["value"]) for c in mqtt.calls] == [("temp", 22)]
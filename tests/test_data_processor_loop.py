@@ -17,7 +17,7 @@ def test_throttle_loop_flushes_numeric_and_string(mocker):
     p.dispatch_reading("dev1", "state", "Closed", "Dev", "Model", radio_name="RTL0", radio_freq="433M")
 
     # sleep once (process), then raise to stop loop
-    mocker.patch.object(data_processor.time, "sleep", side_effect=[None, KeyboardInterrupt])
+    mocker.patch.object(p._wakeup, "wait", side_effect=[None, KeyboardInterrupt])
 
     with pytest.raises(KeyboardInterrupt):
         p.start_throttle_loop()
@@ -34,7 +34,7 @@ def test_throttle_loop_no_buffer_sends_nothing(mocker):
     p = DataProcessor(mqtt)
 
     # buffer is empty; loop will continue, so stop it on 2nd sleep
-    mocker.patch.object(data_processor.time, "sleep", side_effect=[None, KeyboardInterrupt])
+    mocker.patch.object(p._wakeup, "wait", side_effect=[None, KeyboardInterrupt])
 
     with pytest.raises(KeyboardInterrupt):
         p.start_throttle_loop()
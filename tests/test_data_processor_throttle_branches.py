@@ -57,7 +57,7 @@ def test_throttle_loop_flushes_and_formats_values(monkeypatch, capsys):
             return
         raise StopIteration
 
-    monkeypatch.setattr(data_processor.time, "sleep", fake_sleep)
+    monkeypatch.setattr(dp._wakeup, "wait", fake_sleep)
 
     with pytest.raises(StopIteration):
         dp.start_throttle_loop()
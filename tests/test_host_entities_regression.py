@@ -64,6 +64,7 @@ def test_main_sets_slot_for_missing_ids_in_manual_mode(mocker):
     class DummyProcessor:
         def __init__(self, mqtt): self.mqtt = mqtt
         def start_throttle_loop(self): return
+        def stop(self): return
 
     mocker.patch.object(main, "HomeNodeMQTT", DummyMQTT)
     mocker.patch.object(main, "DataProcessor", DummyProcessor)
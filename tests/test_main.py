@@ -50,7 +50,7 @@ def test_get_version_appends_build_metadata(mocker, monkeypatch):
 def test_check_dependencies_missing_rtl_433_exits(mocker):
     main = import_main_safely()
 
-    mocker.patch("subprocess.run", return_value=mocker.Mock(stdout=b""))
+    mocker.patch("shutil.which", return_value=None)
     # paho spec doesn't matter if rtl_433 missing first
     mocker.patch("importlib.util.find_spec", return_value=object())
 
@@ -61,7 +61,7 @@ def test_check_dependencies_missing_rtl_433_exits(mocker):
 def test_check_dependencies_missing_paho_exits(mocker):
     main = import_main_safely()
 
-    mocker.patch("subprocess.run", return_value=mocker.Mock(stdout=b"/usr/bin/rtl_433\n"))
+    mocker.patch("shutil.which", return_value="/usr/bin/rtl_433")
     mocker.patch("importlib.util.find_spec", return_value=None)
 
     with pytest.raises(SystemExit):
@@ -70,7 +70,7 @@ def test_check_dependencies_missing_paho_exits(mocker):
 
 def test_main_smoke_run_exits_cleanly(mocker):
     # OPTIONAL but makes this test not require rtl_433 installed:
-    mocker.patch("subprocess.run", return_value=mocker.Mock(stdout=b"/usr/bin/rtl_433\n"))
+    mocker.patch("shutil.which", return_value="/usr/bin/rtl_433")
     mocker.patch("importlib.util.find_spec", return_value=object())
 
     main = import_main_safely()
@@ -88,6 +88,7 @@ def test_main_smoke_run_exits_cleanly(mocker):
     class DummyProcessor:
         def __init__(self, mqtt): self.mqtt = mqtt
         def start_throttle_loop(self): return
+        def stop(self): return
 
     class DummyThread:
         def __init__(self, target=None, args=(), daemon=None):
@@ -123,3 +124,48 @@ def test_main_smoke_run_exits_cleanly(mocker):
 
     main.main()
 
+
+
+def test_main_shutdown_flushes_processor_before_mqtt_stop(mocker):
+    mocker.patch("shutil.which", return_value="/usr/bin/rtl_433")
+    mocker.patch("importlib.util.find_spec", return_value=object())
+
+    main = import_main_safely()
+    mocker.patch.object(main, "check_dependencies", lambda: None)
+    mocker.patch.object(main, "show_logo", lambda *_: None)
+
+    order = []
+
+    class DummyMQTT:
+        def __init__(self, version=None): pass
+        def start(self): pass
+        def stop(self): order.append("mqtt.stop")
+
+    class DummyProcessor:
+        def __init__(self, mqtt): pass
+        def start_throttle_loop(self): return
+        def stop(self): order.append("processor.stop")
+
+    class DummyThread:
+        def __init__(self, target=None, args=(), daemon=None): pass
+        def start(self): return
+
+    mocker.patch.object(main, "HomeNodeMQTT", DummyMQTT)
+    mocker.patch.object(main, "DataProcessor", DummyProcessor)
+    mocker.patch.object(main, "discover_rtl_devices", return_value=[{"name": "RTL0", "id": "000", "index": 0}])
+    mocker.patch.object(main, "get_system_mac", return_value="aa:bb:cc:dd:ee:ff")
+    mocker.patch.object(main, "validate_radio_config", return_value=[])
+    mocker.patch.object(main.config, "RTL_CONFIG", [])
+    mocker.patch.object(main.config, "BRIDGE_NAME", "Bridge")
+    mocker.patch.object(main.threading, "Thread", DummyThread)
+
+    calls = {"n": 0}
+    def fake_sleep(_):
+        calls["n"] += 1
+        if calls["n"] >= 2:
+            raise KeyboardInterrupt()
+    mocker.patch.object(main.time, "sleep", side_effect=fake_sleep)
+
+    main.main()
+
+    assert order == ["processor.stop", "mqtt.stop"]
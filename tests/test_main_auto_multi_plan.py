@@ -42,6 +42,9 @@ class DummyProcessor:
     def start_throttle_loop(self):
         return None
 
+    def stop(self):
+        return None
+
 
 def _setup_main_for_test(monkeypatch, detected_devices, country_code):
     FakeThread.created.clear()
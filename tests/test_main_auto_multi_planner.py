@@ -25,6 +25,9 @@ class DummyProcessor:
         # no-op for tests
         return
 
+    def stop(self):
+        return
+
 
 class FakeThread:
     """
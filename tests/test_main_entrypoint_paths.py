@@ -57,6 +57,9 @@ class DummyProcessor:
     def start_throttle_loop(self):
         return None
 
+    def stop(self):
+        return None
+
 
 def _patch_sleep_to_exit(monkeypatch, main_mod):
     """Exit main's infinite loop by raising KeyboardInterrupt on the 1s sleep."""
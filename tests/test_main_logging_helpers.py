@@ -20,16 +20,7 @@ def test_main_timestamped_print_formats_startup_and_debug(monkeypatch):
     captured = []
 
     # Make timestamp deterministic
-    class FakeNow:
-        def strftime(self, _fmt):
-            return "12:34:56"
-
-    class FakeDateTime:
-        @staticmethod
-        def now():
-            return FakeNow()
-
-    monkeypatch.setattr(main, "datetime", FakeDateTime)
+    monkeypatch.setattr(main, "_log_time", lambda: "12:34:56")
 
     # Capture what timestamped_print emits
     def fake_original_print(msg, *a, **k):
@@ -48,6 +39,29 @@ def test_main_timestamped_print_formats_startup_and_debug(monkeypatch):
     assert main.c_magenta in joined or main.c_cyan in joined  # some ANSI
 
 
+def test_main_log_time_formats_once_per_second(monkeypatch):
+    import main
+
+    calls = []
+    real_localtime = main.time.localtime
+
+    def fake_localtime(sec):
+        calls.append(sec)
+        return real_localtime(sec)
+
+    monkeypatch.setattr(main, "_ts_sec", None)
+    monkeypatch.setattr(main.time, "localtime", fake_localtime)
+    monkeypatch.setattr(main.time, "time", lambda: 1000.25)
+    first = main._log_time()
+    monkeypatch.setattr(main.time, "time", lambda: 1000.75)
+    assert main._log_time() == first
+    assert calls == [1000]
+
+    monkeypatch.setattr(main.time, "time", lambda: 1001.0)
+    main._log_time()
+    assert calls == [1000, 1001]
+
+
 def test_main_get_version_reads_config_yaml(tmp_path, monkeypatch):
     import main
 
@@ -61,6 +75,19 @@ def test_main_get_version_reads_config_yaml(tmp_path, monkeypatch):
     assert main.get_version() == "v1.2.3"
 
 
+def test_main_get_version_fallback_scan_without_version_utils(tmp_path, monkeypatch):
+    import sys
+    import main
+
+    # Make `from version_utils import ...` fail so the legacy scan runs.
+    monkeypatch.setitem(sys.modules, "version_utils", None)
+
+    (tmp_path / "config.yaml").write_bytes(b"name: x\r\n  version: '2.0.1'\r\n")
+    monkeypatch.setattr(main, "__file__", str(tmp_path / "main.py"))
+
+    assert main.get_version() == "v2.0.1"
+
+
 def test_main_show_logo_writes_to_stdout(capsys):
     import main
 
@@ -34,12 +34,7 @@ def test_timestamped_print_error_warning_and_tx_branches(monkeypatch):
     monkeypatch.setattr(m, "_original_print", cap)
 
     # Freeze time
-    class FakeDT:
-        @staticmethod
-        def now():
-            return types.SimpleNamespace(strftime=lambda fmt: "00:00:00")
-
-    monkeypatch.setattr(m, "datetime", FakeDT)
+    monkeypatch.setattr(m, "_log_time", lambda: "00:00:00")
 
     # ERROR path
     m.timestamped_print("ERROR: something bad happened")
@@ -58,7 +53,7 @@ def test_check_dependencies_paho_missing_exits(monkeypatch):
     m = import_main_safely()
 
     # rtl_433 exists
-    monkeypatch.setattr(m.subprocess, "run", lambda *a, **k: types.SimpleNamespace(stdout=b"/usr/bin/rtl_433\n"))
+    monkeypatch.setattr(m.shutil, "which", lambda name: "/usr/bin/rtl_433")
     # paho missing
     monkeypatch.setattr(m.importlib.util, "find_spec", lambda name: None)
 
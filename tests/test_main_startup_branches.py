@@ -15,6 +15,7 @@ def test_main_manual_config_duplicate_ids_and_unconfigured_hardware(mocker, caps
     class DummyProcessor:
         def __init__(self, mqtt): self.mqtt = mqtt
         def start_throttle_loop(self): return
+        def stop(self): return
 
     class DummyThread:
         def __init__(self, target=None, args=(), daemon=None):
@@ -99,6 +100,7 @@ def test_main_auto_mode_warns_when_ignoring_extra_radios(mocker, capsys):
     class DummyProcessor:
         def __init__(self, mqtt): self.mqtt = mqtt
         def start_throttle_loop(self): return
+        def stop(self): return
 
     class DummyThread:
         def __init__(self, target=None, args=(), daemon=None): pass
@@ -162,6 +164,7 @@ def test_main_deduplicates_hardware_serials(mocker, capsys):
     class DummyProcessor:
         def __init__(self, mqtt): self.mqtt = mqtt
         def start_throttle_loop(self): return
+        def stop(self): return
 
     mocker.patch.object(main, "HomeNodeMQTT", DummyMQTT)
     mocker.patch.object(main, "DataProcessor", DummyProcessor)
@@ -187,3 +187,17 @@ def test_send_sensor_radio_status_does_not_crash(mocker):
     _call_send_sensor(h, field="radio_status", value="OK", unit=None)
 
     assert any(t.endswith("/config") for (t, _p, _q, _r) in dummy.published)
+
+
+def test_on_connect_tunes_broker_socket(mocker):
+    import socket
+    import mqtt_handler
+
+    h, client = _make_handler(mocker)
+    sock = mocker.Mock()
+    client.socket = lambda: sock
+
+    h._on_connect(client, None, None, 0)
+
+    sock.setsockopt.assert_any_call(socket.SOL_SOCKET, socket.SO_SNDBUF, mqtt_handler.MQTT_SNDBUF_BYTES)
+    sock.setsockopt.assert_any_call(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
@@ -449,3 +449,109 @@ def test_start_success_and_failure_and_stop(monkeypatch):
     c2.connect = boom_connect
     with pytest.raises(SystemExit):
         h2.start()
+
+
+def test_publish_discovery_skips_unchanged_and_tracks_extra_payload_overrides(monkeypatch):
+    h, c = _make_handler(monkeypatch)
+    topic = "homeassistant/sensor/dev_temp_c_T/config"
+
+    def configs():
+        return [p for (t, p, _r) in c.published if t == topic]
+
+    assert h._publish_discovery("temp_c", "home/x", "dev_temp_c", "Dev", "M") is True
+    assert h._publish_discovery("temp_c", "home/x", "dev_temp_c", "Dev", "M") is False
+    assert len(configs()) == 1
+
+    # Signature keys overridden via extra_payload still count as a metadata change.
+    assert h._publish_discovery(
+        "temp_c", "home/x", "dev_temp_c", "Dev", "M", extra_payload={"icon": "mdi:flask"}
+    ) is True
+    assert json.loads(configs()[-1])["icon"] == "mdi:flask"
+    assert h._publish_discovery(
+        "temp_c", "home/x", "dev_temp_c", "Dev", "M", extra_payload={"icon": "mdi:flask"}
+    ) is False
+    assert len(configs()) == 2
+
+
+def test_refresh_utility_entities_only_replays_that_device(monkeypatch):
+    h, _c = _make_handler(monkeypatch)
+    monkeypatch.setattr(mqtt_handler, "clean_mac", lambda s: s)
+
+    h.send_sensor("meter1", "Consumption", 100, "Meter 1", "ERT-SCM", is_rtl=True)
+    h.send_sensor("meter2", "Consumption", 200, "Meter 2", "ERT-SCM", is_rtl=True)
+    assert h._utility_last_raw == {"meter1": {"Consumption": 100}, "meter2": {"Consumption": 200}}
+
+    calls = []
+    monkeypatch.setattr(h, "send_sensor", lambda cid, field, value, *a, **k: calls.append((cid, field, value)))
+    h._refresh_utility_entities_for_device("meter1", "Meter 1", "ERT-SCM")
+
+    assert calls == [("meter1", "Consumption", 100)]
+
+
+def test_publish_discovery_republishes_when_field_meta_changes(monkeypatch):
+    h, c = _make_handler(monkeypatch)
+    topic = "homeassistant/sensor/dev_temperature_C_T/config"
+
+    def configs():
+        return [json.loads(p) for (t, p, _r) in c.published if t == topic]
+
+    assert h._publish_discovery("temperature_C", "home/x", "dev_temperature_C", "Dev", "M") is True
+    assert h._publish_discovery("temperature_C", "home/x", "dev_temperature_C", "Dev", "M") is False
+
+    # Same call inputs, different metadata source: the retained config must follow.
+    monkeypatch.setitem(
+        mqtt_handler.FIELD_META, "temperature_C", ("°F", "temperature", "mdi:thermometer", "Temperature (F)")
+    )
+    assert h._publish_discovery("temperature_C", "home/x", "dev_temperature_C", "Dev", "M") is True
+    assert configs()[-1]["unit_of_measurement"] == "°F"
+    assert len(configs()) == 2
+
+
+def test_publish_discovery_follows_in_place_main_sensors_edit(monkeypatch):
+    h, c = _make_handler(monkeypatch)
+    topic = "homeassistant/sensor/dev_temp_c_T/config"
+    main_sensors = []
+    monkeypatch.setattr(config, "MAIN_SENSORS", main_sensors, raising=False)
+
+    assert h._publish_discovery("temp_c", "home/x", "dev_temp_c", "Dev", "M") is True
+    main_sensors.append("temp_c")
+    assert h._publish_discovery("temp_c", "home/x", "dev_temp_c", "Dev", "M") is True
+
+    cfgs = [json.loads(p) for (t, p, _r) in c.published if t == topic]
+    assert cfgs[0].get("entity_category") == "diagnostic"
+    assert "entity_category" not in cfgs[-1]
+
+
+def test_button_device_block_follows_live_bridge_name(monkeypatch):
+    h, c = _make_handler(monkeypatch)
+    monkeypatch.setattr(config, "BRIDGE_NAME", "Renamed", raising=False)
+    # Normally set by _on_connect
+    h.nuke_command_topic = "home/status/rtl_bridge_T/nuke/set"
+    h.restart_command_topic = "home/status/rtl_bridge_T/restart/set"
+
+    h._publish_nuke_button()
+    h._publish_restart_button()
+
+    for kind in ("nuke", "restart"):
+        topic = f"homeassistant/button/rtl_bridge_{kind}_T/config"
+        device = json.loads([p for (t, p, _r) in c.published if t == topic][-1])["device"]
+        assert device["model"] == "Renamed"
+        assert device["name"].startswith("Renamed (")
+        sys_id = device["name"][len("Renamed ("):-1]
+        assert device["identifiers"] == [f"rtl433_Renamed_{sys_id}"]
+
+
+def test_send_sensor_stores_non_str_model_once(monkeypatch):
+    h, _c = _make_handler(monkeypatch)
+    stores = []
+
+    class _CountingDict(dict):
+        def __setitem__(self, key, value):
+            stores.append((key, value))
+            super().__setitem__(key, value)
+
+    h._device_model_by_id = _CountingDict()
+    h.send_sensor("aa:bb", "door", "OPEN", "Dev", 900, is_rtl=False)
+    h.send_sensor("aa:bb", "door", "CLOSED", "Dev", 900, is_rtl=False)
+
+    assert stores == [("deadbeef", "900")]
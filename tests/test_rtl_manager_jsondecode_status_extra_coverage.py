@@ -38,3 +38,50 @@ def test_rtl_loop_publishes_status_on_no_supported_devices(mocker):
         (len(c.args) >= 3 and c.args[1].startswith("radio_status_") and "No RTL-SDR device" in str(c.args[2]))
         for c in calls
     )
+
+
+def test_rtl_loop_signals_ready_once_tuned(mocker):
+    """main() staggers radio starts on this event instead of a fixed sleep."""
+    import threading
+
+    ready = threading.Event()
+    seen = []
+
+    def stop(_secs):
+        raise InterruptedError("stop")
+
+    mocker.patch("rtl_manager.time.sleep", side_effect=stop)
+
+    proc = mocker.Mock()
+
+    def readline():
+        seen.append(ready.is_set())
+        return lines.pop(0)
+
+    lines = ["rtl_433 version 23.11\n", "Tuned to 433.920MHz.\n", "noise\n", ""]
+    proc.stdout.readline.side_effect = readline
+    proc.poll.return_value = 0
+    mocker.patch("rtl_manager.subprocess.Popen", return_value=proc)
+
+    radio = {"name": "RTL0", "id": "000", "index": 0, "freq": "433.92M"}
+
+    with pytest.raises(InterruptedError):
+        rtl_manager.rtl_loop(radio, mocker.Mock(), mocker.Mock(), "SYS", "MODEL", ready)
+
+    # Not ready before the tune line, ready right after it.
+    assert seen[:3] == [False, False, True]
+
+
+def test_rtl_loop_signals_ready_when_rtl433_fails_to_start(mocker):
+    import threading
+
+    ready = threading.Event()
+    mocker.patch("rtl_manager.time.sleep", side_effect=InterruptedError("stop"))
+    mocker.patch("rtl_manager.subprocess.Popen", side_effect=OSError("boom"))
+
+    radio = {"name": "RTL0", "id": "000", "index": 0}
+
+    with pytest.raises(InterruptedError):
+        rtl_manager.rtl_loop(radio, mocker.Mock(), mocker.Mock(), "SYS", "MODEL", ready)
+
+    assert ready.is_set()
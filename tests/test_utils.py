@@ -33,6 +33,12 @@ def test_clean_mac():
     # Code converts None -> "None" -> "none"
     assert clean_mac(None) == "none"
 
+def test_clean_mac_cache_keeps_numeric_types_apart():
+    # Equal-hashing IDs of different types must not share a cached result.
+    assert clean_mac(1) == "1"
+    assert clean_mac(1.0) == "10"
+    assert clean_mac(True) == "true"
+
 def test_calculate_dew_point():
     # Standard check: 20C at 50% humidity is approx 9.3C (48.7F)
     dp = calculate_dew_point(20, 50)
@@ -43,6 +49,14 @@ def test_calculate_dew_point():
     assert calculate_dew_point(20, None) is None
     assert calculate_dew_point(20, 0) is None # Invalid humidity
 
+def test_clean_mac_unhashable_id_is_cleaned_not_raised():
+    assert clean_mac(["12:AB"]) == "12ab"
+
+def test_calculate_dew_point_bad_inputs_return_none():
+    # Unhashable (can't be memoized) and non-numeric inputs both keep the None contract.
+    assert calculate_dew_point([20], 50) is None
+    assert calculate_dew_point("20", 50) is None
+
 def test_validate_radio_config():
     # 1. Valid Config
     valid = {"id": "100", "freq": "433.92M", "rate": "250k"}
@@ -64,6 +78,16 @@ def test_validate_radio_config():
     warns = validate_radio_config(bad_rate)
     assert any("did you mean '250k'" in w.lower() for w in warns)
 
+def test_validate_radio_config_unitless_frequency_forms():
+    def impossible(freq):
+        return [w for w in validate_radio_config({"id": "1", "freq": freq}) if "impossible" in w]
+
+    assert len(impossible("433.92")) == 1
+    # Malformed numbers are not treated as bare Hz values.
+    assert impossible("433.") == []
+    assert impossible(".5") == []
+    assert impossible("1.2.3") == []
+
 def test_validate_radio_config_does_not_require_id_for_rtl_tcp_device():
     # device selector implies explicit device choice; id warning should NOT trigger
     cfg = {"name": "PC rtl_tcp", "freq": "433.92M", "device": "rtl_tcp:192.168.1.223:1234"}
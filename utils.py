@@ -13,11 +13,14 @@ import math
 import socket
 import os
 import json
+from functools import lru_cache
 import config
 
 # Global cache
 _SYSTEM_MAC = None
 
+_NON_ALNUM_RE = re.compile(r'[^A-Za-z0-9]')
+
 def get_system_mac():
     global _SYSTEM_MAC
     if _SYSTEM_MAC: 
@@ -41,12 +44,36 @@ def get_system_mac():
     except Exception:
         return "rtl-bridge-error-id"
 
-def clean_mac(mac):
-    """Cleans up MAC/ID string for use in topic/unique IDs."""
+# Device IDs repeat for the life of the process, so the cache hit rate is ~100%.
+# typed=True: 1, 1.0 and True hash alike but clean to different IDs.
+def _clean_mac(mac):
     # Removes special characters to make it MQTT-safe
-    cleaned = re.sub(r'[^A-Za-z0-9]', '', str(mac))
+    s = str(mac)
+    # Most IDs (numeric rtl_433 ids, bare hex) are already clean.
+    if s.isascii() and s.isalnum():
+        return s.lower()
+    cleaned = _NON_ALNUM_RE.sub('', s)
     return cleaned.lower() if cleaned else "unknown"
 
+_clean_mac_cached = lru_cache(maxsize=4096, typed=True)(_clean_mac)
+
+def clean_mac(mac):
+    """Cleans up MAC/ID string for use in topic/unique IDs."""
+    try:
+        return _clean_mac_cached(mac)
+    except TypeError:
+        # Unhashable id (e.g. a list from odd JSON): clean it uncached.
+        return _clean_mac(mac)
+
+# Readings come in at 0.1 C / 1 % resolution, so exact (temp, humidity) pairs repeat.
+@lru_cache(maxsize=4096)
+def _dew_point_f(temp_c, humidity):
+    b = 17.62
+    c = 243.12
+    gamma = (b * temp_c / (c + temp_c)) + math.log(humidity / 100.0)
+    dp_c = (c * gamma) / (b - gamma)
+    return round(dp_c * 1.8 + 32, 1) # Return Fahrenheit
+
 def calculate_dew_point(temp_c, humidity):
     """Calculates Dew Point (F) using Magnus Formula."""
     if temp_c is None or humidity is None:
@@ -54,14 +81,16 @@ def calculate_dew_point(temp_c, humidity):
     if humidity <= 0:
         return None 
     try:
-        b = 17.62
-        c = 243.12
-        gamma = (b * temp_c / (c + temp_c)) + math.log(humidity / 100.0)
-        dp_c = (c * gamma) / (b - gamma)
-        return round(dp_c * 1.8 + 32, 1) # Return Fahrenheit
+        # Inside the try: unhashable inputs fail in the cache lookup, and still give None.
+        return _dew_point_f(temp_c, humidity)
     except Exception:
         return None
 
+def _is_unitless_number(s):
+    """True for a bare '123' or '123.45' (no unit suffix)."""
+    whole, dot, frac = s.partition(".")
+    return whole.isdigit() and (not dot or frac.isdigit())
+
 def validate_radio_config(radio_conf):
     """Analyze a radio configuration dictionary for common user errors.
 
@@ -81,7 +110,8 @@ def validate_radio_config(radio_conf):
     warnings = []
 
     def _is_tcp_selector(dev: str) -> bool:
-        return dev.strip().lower().startswith("rtl_tcp:")
+        # Only the 8-char prefix needs case-folding, not the whole selector.
+        return dev.lstrip()[:8].lower() == "rtl_tcp:"
 
     def _safe_int(value, default=0):
         try:
@@ -98,11 +128,11 @@ def validate_radio_config(radio_conf):
 
     # 1) Frequency suffix check (rtl_433 defaults to Hz if no suffix is present)
     freq_str = str(radio_conf.get("freq", ""))
-    frequencies = [f.strip() for f in freq_str.split(",") if f.strip()]
+    frequencies = [f for f in (part.strip() for part in freq_str.split(",")) if f]
 
     for f in frequencies:
         # pure number with no unit suffix
-        if re.match(r"^\d+(\.\d+)?$", f):
+        if _is_unitless_number(f):
             try:
                 val = float(f)
             except Exception:
@@ -130,7 +160,7 @@ def validate_radio_config(radio_conf):
 
     # 3) Sample rate suffix check
     rate = str(radio_conf.get("rate", ""))
-    if re.match(r"^\d+$", rate):
+    if rate.isdigit():
         try:
             val = int(rate)
         except Exception:
@@ -149,9 +179,10 @@ def validate_radio_config(radio_conf):
     tcp_port = radio_conf.get("tcp_port")
     r_id = radio_conf.get("id")
 
-    is_tcp = bool(tcp_host) or _is_tcp_selector(dev)
+    tcp_selector = _is_tcp_selector(dev)
+    is_tcp = bool(tcp_host) or tcp_selector
 
-    if _is_tcp_selector(dev):
+    if tcp_selector:
         # Best-effort parse: rtl_tcp:HOST:PORT
         parts = dev.split(":", 2)
         if len(parts) < 3 or not parts[1].strip():
@@ -216,11 +247,21 @@ def get_homeassistant_country_code() -> str | None:
     return None
 
 
-_EU_868_COUNTRIES = {
+_EU_868_COUNTRIES = frozenset({
     # EU + EEA + UK + CH (broadly 868 MHz ISM users)
     "AT","BE","BG","HR","CY","CZ","DK","EE","FI","FR","DE","GR","HU","IE","IT",
     "LV","LT","LU","MT","NL","PL","PT","RO","SK","SI","ES","SE",
     "IS","LI","NO","CH","GB",
+})
+
+# Named secondary-radio plans -> (freq_str, hop_interval).
+_SECONDARY_BAND_PLANS = {
+    **dict.fromkeys(("eu", "europe", "uk"), ("868M", 0)),
+    **dict.fromkeys(
+        ("us", "usa", "na", "north_america", "north-america", "canada", "au", "australia", "nz", "new_zealand"),
+        ("915M", 0),
+    ),
+    **dict.fromkeys(("world", "global", "intl", "international"), ("868M,915M", 15)),
 }
 
 
@@ -259,14 +300,9 @@ def choose_secondary_band_defaults(
         # Unknown country: be internationally tolerant by hopping both.
         return ("868M,915M", 15)
 
-    if p in ("eu", "europe", "uk"):
-        return ("868M", 0)
-
-    if p in ("us", "usa", "na", "north_america", "north-america", "canada", "au", "australia", "nz", "new_zealand"):
-        return ("915M", 0)
-
-    if p in ("world", "global", "intl", "international"):
-        return ("868M,915M", 15)
+    fixed = _SECONDARY_BAND_PLANS.get(p)
+    if fixed is not None:
+        return fixed
 
     # Treat anything else as a custom freq string.
     # If multiple freqs are provided, hop interval is enabled.
@@ -274,6 +310,10 @@ def choose_secondary_band_defaults(
     hop = 15 if "," in freq_str else 0
     return (freq_str, hop)
 
+# Hopper radio candidate bands, in "interesting" order (see choose_hopper_band_defaults).
+_HOPPER_BANDS_EU = ("169.4M", "868.95M", "869.525M", "915M")
+_HOPPER_BANDS_OTHER = ("315M", "345M", "390M", "868M")
+
 
 def choose_hopper_band_defaults(
     country_code: str | None = None,
@@ -298,10 +338,8 @@ def choose_hopper_band_defaults(
     cc = (country_code or "").strip().upper()
     u = {s.strip().lower() for s in (used_freqs or set()) if s.strip()}
 
-    if cc and cc in _EU_868_COUNTRIES:
-        candidates = ["169.4M", "868.95M", "869.525M", "915M"]
-    else:
-        candidates = ["315M", "345M", "390M", "868M"]
+    candidates = _HOPPER_BANDS_EU if cc in _EU_868_COUNTRIES else _HOPPER_BANDS_OTHER
 
-    chosen = [f for f in candidates if f.strip().lower() not in u]
+    # Candidates are clean literals; only the lowercase form is needed to compare.
+    chosen = [f for f in candidates if f.lower() not in u]
     return ",".join(chosen)